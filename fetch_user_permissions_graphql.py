@@ -6,18 +6,297 @@ Creates comprehensive CSV mapping users to repositories and their access levels.
 """
 
 import requests
-import json
+from requests.adapters import HTTPAdapter
+import orjson
 import csv
 import sys
 import os
 import time
-import subprocess
-from datetime import datetime, timedelta
+import random
+import threading
+import functools
+import itertools
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime
+import numpy as np
 import pandas as pd
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Callable, Iterator, Tuple
+
+# Column order of the detailed permissions CSV
+PERMISSION_FIELDNAMES = [
+    'username', 'user_name', 'user_email', 'user_type', 'user_company', 'user_location',
+    'repo_name', 'repo_full_name', 'permission', 
+    'is_private_repo', 'is_archived_repo', 'is_fork_repo', 'is_disabled_repo',
+    'repo_updated_at', 'repo_created_at', 'data_source'
+]
+
+# Write buffer for the final CSV files; large outputs are flushed in few big writes
+_CSV_BUFFER_SIZE = 1 << 20
+
+# Lowercase (interned) form of each known GraphQL permission value; see _lower_permission
+_PERM_LC = {
+    permission: sys.intern(permission.lower())
+    for permission in ('ADMIN', 'MAINTAIN', 'WRITE', 'PUSH', 'TRIAGE', 'READ', 'PULL')
+}
+
+
+def _lower_permission(permission: Optional[str]) -> str:
+    """Lowercase a GraphQL permission; missing or empty permissions become 'unknown'."""
+    if not permission:
+        return 'unknown'
+    return _PERM_LC.get(permission) or permission.lower()
+
+
+# User summary column counting each lowercase permission; legacy push/pull count as write/read
+_PERM_BUCKET = {
+    'admin': 'admin_repos', 'maintain': 'maintain_repos', 'write': 'write_repos', 'push': 'write_repos',
+    'triage': 'triage_repos', 'read': 'read_repos', 'pull': 'read_repos'
+}
+
+# Consecutive 401/403 responses after which the token is treated as lacking access and
+# further API requests are skipped instead of failing one by one
+_AUTH_FAILURE_LIMIT = 5
+
+# GraphQL error types returned when the token may not list organization teams (no 'read:org'
+# scope); only these leave the team index empty on purpose, any other failure makes it incomplete
+_TEAM_SCOPE_ERRORS = frozenset({'FORBIDDEN', 'INSUFFICIENT_SCOPES'})
+
+# Retry delays in seconds for transient failures, indexed by attempt (last value repeats)
+_BACKOFF = (2, 3, 5, 9)
+
+# Emoji and log label for each retryable failure kind
+_RETRY_LABELS = {
+    'timeout': ('⏰', 'Request timeout'),
+    'conn': ('🔌', 'Connection error'),
+    'http': ('⚠️ ', 'Server error'),
+    'rate': ('🚦', 'Rate limited'),
+}
+
+def _retry_after(response: requests.Response) -> Optional[float]:
+    """Seconds requested by a Retry-After header, or None when absent or not a delay in seconds."""
+    try:
+        return max(0.0, float(response.headers['Retry-After']))
+    except (KeyError, TypeError, ValueError):
+        return None
+
+# GraphQL documents, defined once at module level and referenced by name
+
+# Collaborator fields shared by the repository listing and the per-repository follow-up pages
+_COLLABORATOR_CONNECTION_FRAGMENT = """
+fragment CollaboratorConnectionFields on RepositoryCollaboratorConnection {
+    totalCount
+    pageInfo {
+        hasNextPage
+        endCursor
+    }
+    edges {
+        permission
+        node {
+            login
+            name
+            __typename
+            ... on User {
+                company
+                location
+            }
+        }
+    }
+}
+"""
+
+# Startup checks (connection, token/organization access, rate limit) in one round trip
+_Q_STARTUP = """
+query($org: String!) {
+    viewer {
+        login
+        organizations(first: 100) {
+            nodes {
+                login
+            }
+        }
+    }
+    organization(login: $org) {
+        login
+        viewerCanAdminister
+        viewerIsAMember
+    }
+    rateLimit {
+        limit
+        remaining
+        resetAt
+        used
+    }
+}
+"""
+
+_Q_RATE_LIMIT = """
+query {
+    rateLimit {
+        limit
+        remaining
+        resetAt
+        used
+    }
+}
+"""
+
+# Repositories page with the first page of each repository's direct collaborators.
+# $isArchived / $isFork filter server-side when set; null returns all repositories.
+_Q_REPOS_PAGE = """
+query($org: String!, $first: Int!, $after: String, $isArchived: Boolean, $isFork: Boolean) {
+    rateLimit {
+        cost
+        remaining
+    }
+    organization(login: $org) {
+        repositories(first: $first, after: $after, isArchived: $isArchived, isFork: $isFork,
+                     orderBy: {field: UPDATED_AT, direction: DESC}) {
+            pageInfo {
+                hasNextPage
+                endCursor
+            }
+            totalCount
+            nodes {
+                name
+                nameWithOwner
+                isPrivate
+                isArchived
+                isFork
+                isDisabled
+                updatedAt
+                createdAt
+                collaborators(first: 100, affiliation: DIRECT) {
+                    ...CollaboratorConnectionFields
+                }
+            }
+        }
+    }
+}
+""" + _COLLABORATOR_CONNECTION_FRAGMENT
+
+_Q_COLLABORATORS = """
+query($repo_owner: String!, $repo_name: String!, $first: Int!, $after: String) {
+    repository(owner: $repo_owner, name: $repo_name) {
+        collaborators(first: $first, after: $after, affiliation: DIRECT) {
+            ...CollaboratorConnectionFields
+        }
+    }
+}
+""" + _COLLABORATOR_CONNECTION_FRAGMENT
+
+# Number of repositories whose next collaborators page is requested in one aliased query
+_COLLABORATOR_BATCH_SIZE = 10
+
+@functools.lru_cache(maxsize=None)
+def _batched_collaborators_query(count: int) -> str:
+    """Build one query fetching the next collaborators page of ``count`` repositories via aliases r0..rN."""
+    params = ", ".join(f"$owner{i}: String!, $name{i}: String!, $after{i}: String" for i in range(count))
+    fields = "\n".join(
+        f"    r{i}: repository(owner: $owner{i}, name: $name{i}) {{\n"
+        f"        collaborators(first: 100, after: $after{i}, affiliation: DIRECT) {{\n"
+        f"            ...CollaboratorConnectionFields\n"
+        f"        }}\n"
+        f"    }}"
+        for i in range(count)
+    )
+    return f"query({params}) {{\n{fields}\n}}\n" + _COLLABORATOR_CONNECTION_FRAGMENT
+
+_Q_TEAMS = """
+query($org: String!, $first: Int!, $after: String) {
+    organization(login: $org) {
+        teams(first: $first, after: $after) {
+            pageInfo {
+                hasNextPage
+                endCursor
+            }
+            nodes {
+                slug
+                name
+                repositories(first: 100) {
+                    pageInfo {
+                        hasNextPage
+                        endCursor
+                    }
+                    edges {
+                        permission
+                        node {
+                            nameWithOwner
+                        }
+                    }
+                }
+            }
+        }
+    }
+}
+"""
+
+_Q_TEAM_REPOSITORIES = """
+query($org: String!, $slug: String!, $after: String) {
+    organization(login: $org) {
+        team(slug: $slug) {
+            repositories(first: 100, after: $after) {
+                pageInfo {
+                    hasNextPage
+                    endCursor
+                }
+                edges {
+                    permission
+                    node {
+                        nameWithOwner
+                    }
+                }
+            }
+        }
+    }
+}
+"""
+
+class _Governor:
+    """Adaptive request concurrency and pacing (additive increase, multiplicative decrease).
+    
+    Successful responses widen the worker pool and shrink the inter-page delay; 5xx
+    responses and secondary rate limits halve the width and lengthen the delay. While the
+    primary rate limit budget is low and still falling, successes ease off instead, so the
+    run slows down before it has to stop for the reset.
+    """
+    
+    # Remaining primary budget below which a falling trend stops further widening
+    LOW_BUDGET = 1000
+    
+    def __init__(self, max_width: int, width: float = 4.0):
+        self.max_width = max_width
+        self.width = float(min(width, max_width))
+        self.delay = 0.0
+        self._last_remaining: Optional[int] = None
+        self._lock = threading.Lock()
+    
+    @property
+    def concurrency(self) -> int:
+        return max(1, int(self.width))
+    
+    def on_ok(self, remaining: Optional[int] = None):
+        with self._lock:
+            draining = (remaining is not None and self._last_remaining is not None
+                        and remaining < self._last_remaining and remaining < self.LOW_BUDGET)
+            if remaining is not None:
+                self._last_remaining = remaining
+            if draining:
+                self.width = max(1.0, self.width - 0.5)
+                self.delay = min(5.0, self.delay + 0.1)
+            else:
+                self.width = min(self.max_width, self.width + 0.25)
+                self.delay = max(0.0, self.delay * 0.9)
+    
+    def on_throttle(self):
+        with self._lock:
+            self.width = max(1.0, self.width // 2)
+            self.delay = min(5.0, self.delay * 2 + 0.5)
 
 class GitHubGraphQLPermissionsFetcher:
-    def __init__(self, token: str, organization: str = "relativityone"):
+    def __init__(self, token: str, organization: str = "relativityone", max_workers: int = 10,
+                 start_time: Optional[datetime] = None):
         self.base_url = "https://api.github.com/graphql"
         self.headers = {
             "Authorization": f"Bearer {token}",
@@ -27,35 +306,137 @@ class GitHubGraphQLPermissionsFetcher:
         self.organization = organization
         self.rate_limit_remaining = None
         self.rate_limit_reset = None
+        # Cached response of the combined startup query, shared by the startup checks
+        self._startup = None
         self.total_queries = 0
-        self.start_time = datetime.now()
+        # Elapsed times are measured from here; main() passes its own start so they match the banner
+        self.start_time = start_time or datetime.now()
+        # Inverted organization team index (nameWithOwner -> teams), built once per run
+        self._teams_by_repo: Optional[Dict[str, List[Dict[str, Any]]]] = None
+        # Set when a team listing page failed for a reason other than missing scopes, so team
+        # access in the report would be silently partial
+        self.team_index_incomplete = False
+        # Guards the shared counters/rate-limit state updated by concurrent repository workers
+        self._lock = threading.Lock()
+        # Held by the one worker sleeping out a rate limit reset
+        self._rate_limit_wait_lock = threading.Lock()
+        # Set by stop(); every wait below sleeps on it so an interrupt ends the run promptly
+        self._stop = threading.Event()
+        # Consecutive 401/403 responses; reset by any successful response
+        self._auth_failures = 0
+        # Worker count and page pacing, adjusted from response outcomes
+        self._governor = _Governor(max_workers)
+        
+        # Reuse pooled keep-alive connections for all queries instead of a new TLS handshake per request;
+        # the pool holds at least one connection per worker so concurrent requests never queue or churn sockets
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        self.session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=max(32, max_workers), max_retries=0))
+        
+    def close(self):
+        """Stop any remaining workers and release the pooled HTTP connections."""
+        self.stop()
+        self.session.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    def stop(self):
+        """Request shutdown: pending waits return at once and no further queries are sent."""
+        self._stop.set()
+    
+    @contextmanager
+    def _worker_pool(self, max_workers: int) -> Iterator[ThreadPoolExecutor]:
+        """Thread pool that, on Ctrl-C or any other error, stops the fetcher and drops queued work.
         
-    def execute_graphql_query(self, query: str, variables: Dict[str, Any] = None, max_retries: int = 3) -> Dict[str, Any]:
-        """Execute a GraphQL query with proper error handling, rate limiting, and retry logic."""
+        Draining it instead would keep a worker (such as the page prefetch) sleeping out a rate
+        limit reset or sending queries after the run has already failed.
+        """
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+        try:
+            yield executor
+        except BaseException:
+            self.stop()
+            executor.shutdown(wait=False, cancel_futures=True)
+            raise
+        executor.shutdown()
+        
+    def _backoff_sleep(self, attempt: int, max_retries: int, kind: str, detail: str = '',
+                       retry_after: Optional[float] = None):
+        """Log a retry and sleep for the backoff delay of this attempt.
+        
+        A server-provided Retry-After delay is used as is; otherwise the backoff step gets up
+        to 100% random jitter so concurrent workers do not retry in lockstep. The wait is an
+        Event timeout, which runs on the monotonic clock (wall-clock adjustments cannot shorten
+        or extend it) and ends early when stop() is called.
+        """
+        if retry_after is not None:
+            wait_time = retry_after
+        else:
+            base = _BACKOFF[min(attempt, len(_BACKOFF) - 1)]
+            wait_time = base + random.uniform(0, base)
+        emoji, label = _RETRY_LABELS[kind]
+        print(f"{emoji} {label}{detail}, retrying in {wait_time:.1f}s... (attempt {attempt + 1}/{max_retries + 1})")
+        self._stop.wait(wait_time)
+        
+    def execute_graphql_query(self, query: str, variables: Dict[str, Any] = None, max_retries: int = 3,
+                              shrinkable: bool = False, outcome: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Execute a GraphQL query with proper error handling, rate limiting, and retry logic.
+        
+        With ``shrinkable``, timeouts and 502/504 responses (the failures a smaller request can
+        avoid) return at once instead of being retried, so the caller can resend a smaller page.
+        ``outcome``, when given, receives ``failure='size'`` for those failures, plus the
+        server's ``retry_after`` delay when the response carried one. It also receives the
+        ``latency`` of the last round trip, which excludes rate limit waits and retry backoff.
+        GraphQL errors in a 200 response are reported as the set of their ``error_types``.
+        """
+        if outcome is None:
+            outcome = {}
         payload = {
             "query": query,
             "variables": variables or {}
         }
+        # Serialize once with orjson; Content-Type is already set on the session headers
+        body = orjson.dumps(payload)
+        
+        # Circuit breaker: the token has been refused repeatedly, so further requests would fail too
+        if self.access_denied:
+            return {}
         
         for attempt in range(max_retries + 1):
             try:
                 self.wait_for_rate_limit()
+                # Shutdown requested while waiting (or before this query started)
+                if self._stop.is_set():
+                    return {}
                 
+                started = time.monotonic()
                 # Add timeout to prevent hanging requests
-                response = requests.post(self.base_url, headers=self.headers, json=payload, timeout=60)
-                self.total_queries += 1
+                response = self.session.post(self.base_url, data=body, timeout=60)
                 
-                # Update rate limit info from response headers
-                self.rate_limit_remaining = int(response.headers.get('X-RateLimit-Remaining', 0))
-                self.rate_limit_reset = int(response.headers.get('X-RateLimit-Reset', 0))
+                # Update query count and rate limit info from response headers
+                with self._lock:
+                    self.total_queries += 1
+                    if 'X-RateLimit-Remaining' in response.headers:
+                        self.rate_limit_remaining = int(response.headers['X-RateLimit-Remaining'])
+                        reset = response.headers.get('X-RateLimit-Reset')
+                        self.rate_limit_reset = int(reset) if reset else None
+                outcome['latency'] = time.monotonic() - started
                 
                 if response.status_code == 200:
-                    data = response.json()
+                    remaining = response.headers.get('X-RateLimit-Remaining')
+                    self._governor.on_ok(int(remaining) if remaining else None)
+                    self._auth_failures = 0
+                    data = orjson.loads(response.content)
                     
                     if 'errors' in data:
                         # Handle different types of errors
                         forbidden_errors = [e for e in data['errors'] if e.get('type') == 'FORBIDDEN']
                         other_errors = [e for e in data['errors'] if e.get('type') != 'FORBIDDEN']
+                        outcome['error_types'] = {e.get('type') for e in data['errors']}
                         
                         if forbidden_errors:
                             print(f"⚠️  Access denied for {len(forbidden_errors)} repositories (insufficient permissions)")
@@ -72,37 +453,73 @@ class GitHubGraphQLPermissionsFetcher:
                 
                 # Handle server errors with retry
                 elif response.status_code in [502, 503, 504, 520, 521, 522, 524]:
+                    self._governor.on_throttle()
+                    size_related = response.status_code in (502, 504)
+                    if size_related and shrinkable:
+                        print(f"⚠️  Server error {response.status_code} - the request may be too large")
+                        outcome['failure'] = 'size'
+                        outcome['retry_after'] = _retry_after(response)
+                        return {}
                     if attempt < max_retries:
-                        wait_time = (2 ** attempt) + 1  # Exponential backoff: 2, 5, 9 seconds
-                        print(f"⚠️  Server error {response.status_code}, retrying in {wait_time}s... (attempt {attempt + 1}/{max_retries + 1})")
-                        time.sleep(wait_time)
+                        self._backoff_sleep(attempt, max_retries, 'http', f" {response.status_code}",
+                                            _retry_after(response))
                         continue
                     else:
                         print(f"❌ GraphQL request failed after {max_retries + 1} attempts with status {response.status_code}")
                         print(f"Response: {response.text[:500]}..." if len(response.text) > 500 else f"Response: {response.text}")
+                        if size_related:
+                            outcome['failure'] = 'size'
                         return {}
                 
                 # Handle other HTTP errors
                 else:
+                    body_text = response.text.lower()
+                    secondary_limited = response.status_code == 429 or 'secondary rate limit' in body_text
+                    # Primary limit: the hourly budget is spent (GitHub's exact message covers
+                    # responses that arrive without rate limit headers)
+                    primary_limited = (response.headers.get('X-RateLimit-Remaining') == '0'
+                                       or 'api rate limit exceeded' in body_text) and not secondary_limited
+                    rate_limited = secondary_limited or primary_limited
+                    if secondary_limited:
+                        self._governor.on_throttle()
+                        # Secondary rate limits clear after a pause; wait as instructed and retry
+                        if attempt < max_retries:
+                            self._backoff_sleep(attempt, max_retries, 'rate', f" ({response.status_code})",
+                                                _retry_after(response))
+                            continue
+                    elif primary_limited and attempt < max_retries:
+                        if response.headers.get('X-RateLimit-Reset'):
+                            # The reset time is known (recorded from the response headers); wait_for_rate_limit
+                            # sleeps until then at the top of the next attempt
+                            print(f"🚦 Rate limit exhausted ({response.status_code}), waiting for reset before retrying...")
+                            with self._lock:
+                                self.rate_limit_remaining = 0
+                        else:
+                            self._backoff_sleep(attempt, max_retries, 'rate', f" ({response.status_code})",
+                                                _retry_after(response))
+                        continue
                     print(f"❌ GraphQL request failed with status {response.status_code}")
                     print(f"Response: {response.text[:500]}..." if len(response.text) > 500 else f"Response: {response.text}")
+                    if response.status_code in (401, 403) and not rate_limited:
+                        self._record_auth_failure()
                     return {}
                     
             except requests.exceptions.Timeout:
+                if shrinkable:
+                    print("⏰ Request timeout - the request may be too large")
+                    outcome['failure'] = 'size'
+                    return {}
                 if attempt < max_retries:
-                    wait_time = (2 ** attempt) + 1
-                    print(f"⏰ Request timeout, retrying in {wait_time}s... (attempt {attempt + 1}/{max_retries + 1})")
-                    time.sleep(wait_time)
+                    self._backoff_sleep(attempt, max_retries, 'timeout')
                     continue
                 else:
                     print(f"❌ Request timed out after {max_retries + 1} attempts")
+                    outcome['failure'] = 'size'
                     return {}
                     
             except requests.exceptions.ConnectionError as e:
                 if attempt < max_retries:
-                    wait_time = (2 ** attempt) + 1
-                    print(f"🔌 Connection error, retrying in {wait_time}s... (attempt {attempt + 1}/{max_retries + 1})")
-                    time.sleep(wait_time)
+                    self._backoff_sleep(attempt, max_retries, 'conn')
                     continue
                 else:
                     print(f"❌ Connection failed after {max_retries + 1} attempts: {e}")
@@ -114,25 +531,35 @@ class GitHubGraphQLPermissionsFetcher:
                 
         return {}
     
+    def _record_auth_failure(self):
+        """Count a consecutive 401/403 response and report when the circuit breaker trips."""
+        with self._lock:
+            self._auth_failures += 1
+            tripped = self._auth_failures == _AUTH_FAILURE_LIMIT
+        
+        if tripped:
+            print(f"🛑 {_AUTH_FAILURE_LIMIT} consecutive authorization failures - skipping further API requests")
+            print("💡 The token likely lacks the required scopes ('repo', 'read:org') or has been revoked")
+    
+    @property
+    def access_denied(self) -> bool:
+        """True once the authorization circuit breaker has tripped; results collected since are incomplete."""
+        return self._auth_failures >= _AUTH_FAILURE_LIMIT
+    
+    def startup_probe(self) -> Dict[str, Any]:
+        """Fetch viewer, organization access and rate limit status in one query.
+        
+        The response is cached so the startup checks below share a single round trip.
+        """
+        if self._startup is None:
+            self._startup = self.execute_graphql_query(_Q_STARTUP, {"org": self.organization}, max_retries=2)
+        return self._startup
+    
     def test_api_connection(self) -> bool:
         """Test basic API connectivity and authentication before starting main process."""
-        query = """
-        query {
-            viewer {
-                login
-                id
-            }
-            rateLimit {
-                limit
-                remaining
-                resetAt
-            }
-        }
-        """
-        
         print("🔗 Testing GitHub API connection and authentication...")
         try:
-            data = self.execute_graphql_query(query, max_retries=2)
+            data = self.startup_probe()
             
             if not data or 'viewer' not in data:
                 print("❌ API connection test failed")
@@ -153,29 +580,8 @@ class GitHubGraphQLPermissionsFetcher:
 
     def check_token_permissions(self) -> bool:
         """Check if the token has the necessary permissions for the organization."""
-        query = """
-        query($org: String!) {
-            organization(login: $org) {
-                login
-                viewerCanAdminister
-                viewerIsAMember
-                membersWithRole(first: 1) {
-                    totalCount
-                }
-            }
-            viewer {
-                login
-                organizations(first: 100) {
-                    nodes {
-                        login
-                    }
-                }
-            }
-        }
-        """
-        
         print(f"🔍 Checking token permissions for organization: {self.organization}...")
-        data = self.execute_graphql_query(query, {"org": self.organization})
+        data = self.startup_probe()
         
         if not data or 'viewer' not in data:
             print("❌ Failed to validate token permissions")
@@ -203,21 +609,15 @@ class GitHubGraphQLPermissionsFetcher:
             
         return True
     
-    def check_rate_limit(self) -> bool:
-        """Check current GraphQL rate limit status."""
-        query = """
-        query {
-            rateLimit {
-                limit
-                remaining
-                resetAt
-                used
-            }
-        }
-        """
+    def check_rate_limit(self, data: Optional[Dict[str, Any]] = None) -> bool:
+        """Check current GraphQL rate limit status.
         
+        ``data`` may be an already-fetched response selecting rateLimit (such as the startup
+        probe); the status is queried when it is missing.
+        """
         print("🔍 Checking GraphQL rate limit status...")
-        data = self.execute_graphql_query(query)
+        if not data or 'rateLimit' not in data:
+            data = self.execute_graphql_query(_Q_RATE_LIMIT)
         
         if 'rateLimit' in data:
             rate_limit = data['rateLimit']
@@ -231,8 +631,22 @@ class GitHubGraphQLPermissionsFetcher:
         return False
     
     def wait_for_rate_limit(self):
-        """Wait if we're approaching GraphQL rate limit."""
-        if self.rate_limit_remaining and self.rate_limit_remaining < 100:
+        """Wait if we're approaching GraphQL rate limit.
+        
+        Concurrent workers share one wait: the first thread to see a low budget sleeps and
+        reports the countdown, the others block on the lock and proceed once it is refilled.
+        """
+        if self.rate_limit_remaining is None or self.rate_limit_remaining >= 100:
+            return
+        # Without a recorded reset time there is nothing to wait for; retries back off instead
+        if self.rate_limit_reset is None:
+            return
+        
+        with self._rate_limit_wait_lock:
+            # Another worker may have finished the wait (or been stopped) while this one was blocked
+            if self._stop.is_set() or self.rate_limit_remaining is None or self.rate_limit_remaining >= 100:
+                return
+            
             reset_time = datetime.fromtimestamp(self.rate_limit_reset)
             current_time = datetime.now()
             wait_seconds = max(0, (reset_time - current_time).total_seconds() + 10)
@@ -240,115 +654,69 @@ class GitHubGraphQLPermissionsFetcher:
             print(f"⏳ GraphQL rate limit low ({self.rate_limit_remaining} remaining)")
             print(f"Waiting {wait_seconds:.0f} seconds until {reset_time}")
             
-            # Show countdown
-            while wait_seconds > 0:
-                mins, secs = divmod(int(wait_seconds), 60)
-                print(f"⏲️  Waiting: {mins:02d}:{secs:02d} remaining...", end='\r')
-                time.sleep(1)
-                wait_seconds -= 1
-            print()
+            # Sleep once; a background thread reports the countdown every 30 seconds
+            done = threading.Event()
+            progress = threading.Thread(target=self._report_wait_progress, args=(wait_seconds, done), daemon=True)
+            progress.start()
+            stopped = self._stop.wait(wait_seconds)
+            done.set()
+            progress.join()
+            if stopped:
+                return
             
-            # Re-check rate limit after waiting
-            self.check_rate_limit()
+            # The budget has been refilled; the next response's X-RateLimit-* headers refresh this
+            self.rate_limit_remaining = None
+    
+    def _report_wait_progress(self, wait_seconds: float, done: threading.Event, interval: float = 30):
+        """Print the remaining rate limit wait every ``interval`` seconds until ``done`` is set."""
+        deadline = time.monotonic() + wait_seconds
+        while not done.wait(interval):
+            mins, secs = divmod(int(max(0, deadline - time.monotonic())), 60)
+            print(f"⏲️  Waiting: {mins:02d}:{secs:02d} remaining...")
     
-    def fetch_all_collaborators_for_repo(self, repo_name: str, repo_full_name: str) -> List[Dict[str, Any]]:
-        """Fetch all collaborators for a specific repository with pagination."""
+    def fetch_all_collaborators_for_repo(self, repo_name: str, repo_owner: str,
+                                         first_page: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """Fetch all collaborators for a specific repository with pagination.
+        
+        If ``first_page`` holds an already-fetched collaborators connection (e.g. embedded in
+        the repository listing), it is used as page 1 and only the remaining pages are requested.
+        """
+        # Nothing to page through or parse for repositories without direct collaborators
+        if first_page is not None and first_page.get('totalCount') == 0:
+            return []
+        
         all_collaborators = []
         has_next_page = True
         after_cursor = None
         page_num = 1
         
         while has_next_page:
-            query = """
-            query($repo_owner: String!, $repo_name: String!, $first: Int!, $after: String) {
-                repository(owner: $repo_owner, name: $repo_name) {
-                    collaborators(first: $first, after: $after, affiliation: DIRECT) {
-                        totalCount
-                        pageInfo {
-                            hasNextPage
-                            endCursor
-                        }
-                        nodes {
-                            login
-                            name
-                            avatarUrl
-                            url
-                            __typename
-                            ... on User {
-                                id
-                                company
-                                location
-                            }
-                        }
-                        edges {
-                            permission
-                            node {
-                                login
-                                __typename
-                            }
-                        }
-                    }
+            if first_page is not None:
+                # Page already fetched by the caller
+                collaborators_data = first_page
+                first_page = None
+            else:
+                variables = {
+                    "repo_owner": repo_owner,
+                    "repo_name": repo_name,
+                    "first": 100,
+                    "after": after_cursor
                 }
-            }
-            """
-            
-            # Split the repo full name into owner and name
-            repo_owner = repo_full_name.split('/')[0] if '/' in repo_full_name else self.organization
-            
-            variables = {
-                "repo_owner": repo_owner,
-                "repo_name": repo_name,
-                "first": 100,
-                "after": after_cursor
-            }
             
-            if page_num > 1:
-                print(f"    📄 Fetching collaborators page {page_num} for {repo_name}...")
+                if page_num > 1:
+                    print(f"    📄 Fetching collaborators page {page_num} for {repo_name}...")
             
-            data = self.execute_graphql_query(query, variables)
+                data = self.execute_graphql_query(_Q_COLLABORATORS, variables)
             
-            if not data or 'repository' not in data or not data['repository']:
-                print(f"    ⚠️  Failed to fetch collaborators for {repo_name}")
-                break
-                
-            collaborators_data = data['repository'].get('collaborators', {})
-            if not collaborators_data:
-                break
+                if not data or 'repository' not in data or not data['repository']:
+                    print(f"    ⚠️  Failed to fetch collaborators for {repo_name}")
+                    break
                 
-            # Map collaborator nodes to edges (which contain permissions)
-            collaborator_map = {}
-            edges = collaborators_data.get('edges', [])
-            for edge in edges:
-                if edge and edge.get('node') and edge['node'].get('login'):
-                    login = edge['node']['login']
-                    permission = edge.get('permission', 'unknown')
-                    collaborator_map[login] = permission
-
-            # Process collaborator details
-            nodes = collaborators_data.get('nodes', [])
-            for collaborator in nodes:
-                if not collaborator:
-                    continue
-                    
-                login = collaborator.get('login')
-                if not login:
-                    continue
-                    
-                permission = collaborator_map.get(login, 'unknown')
+                collaborators_data = data['repository'].get('collaborators', {})
+                if not collaborators_data:
+                    break
                 
-                collaborator_data = {
-                    'login': login,
-                    'name': collaborator.get('name', ''),
-                    'email': '',  # Email not accessible with current token scopes
-                    'avatar_url': collaborator.get('avatarUrl', ''),
-                    'url': collaborator.get('url', ''),
-                    'permission': permission,
-                    'type': collaborator.get('__typename', 'User'),
-                    'id': collaborator.get('id', ''),
-                    'company': collaborator.get('company', ''),
-                    'location': collaborator.get('location', '')
-                }
-                all_collaborators.append(collaborator_data)
+            all_collaborators.extend(self._parse_collaborators(collaborators_data))
             
             # Check pagination
             page_info = collaborators_data.get('pageInfo', {})
@@ -356,9 +724,9 @@ class GitHubGraphQLPermissionsFetcher:
             after_cursor = page_info.get('endCursor')
             page_num += 1
             
-            # Add small delay between pages
-            if has_next_page:
-                time.sleep(0.5)
+            # Adaptive delay between pages (zero while the API is healthy)
+            if has_next_page and self._governor.delay > 0:
+                self._stop.wait(self._governor.delay)
         
         total_found = len(all_collaborators)
         expected_total = collaborators_data.get('totalCount', total_found) if 'collaborators_data' in locals() else total_found
@@ -370,296 +738,430 @@ class GitHubGraphQLPermissionsFetcher:
             
         return all_collaborators
 
-    def fetch_teams_for_repo(self, repo_name: str, repo_full_name: str) -> List[Dict[str, Any]]:
-        """Fetch teams with access to a specific repository using only the direct repository teams endpoint.
+    def _fetch_collaborator_overflow(self, repos: List[Dict[str, Any]]):
+        """Extend embedded collaborator pages of repositories with more than 100 collaborators.
         
-        This approach uses GitHub CLI to query only the /repos/{owner}/{repo}/teams endpoint,
-        avoiding organization-wide team enumeration for security and performance reasons.
+        Follow-up pages of up to _COLLABORATOR_BATCH_SIZE repositories are requested in one
+        aliased query, and all batches of a round run concurrently; returned pages are merged
+        into each repository's embedded connection in place. Anything a batch fails to return
+        keeps its cursor, so fetch_all_collaborators_for_repo resumes it.
         """
-        # Check token availability for debugging
-        token = os.getenv('REL_TOKEN') or os.getenv('GITHUB_PAT') or os.getenv('GITHUB_TOKEN')
-        if not token:
-            print(f"    ❌ No authentication token available for team queries")
-            return []
+        pending = [repo for repo in repos
+                   if repo.get('collaborators') and repo['collaborators']['pageInfo']['hasNextPage']]
         
-        # Initialize environment with potential token override
-        env = os.environ.copy()
+        while pending:
+            batches = [pending[i:i + _COLLABORATOR_BATCH_SIZE]
+                       for i in range(0, len(pending), _COLLABORATOR_BATCH_SIZE)]
+            print(f"    📄 Fetching next collaborators page for {len(pending)} repositories in {len(batches)} queries...")
+            
+            pending = []
+            with self._worker_pool(min(len(batches), self._governor.concurrency)) as executor:
+                for unfinished in executor.map(self._advance_collaborator_batch, batches):
+                    pending.extend(unfinished)
+    
+    def _advance_collaborator_batch(self, batch: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Fetch the next collaborators page for a batch of repositories with one aliased query.
         
-        try:
-            # Check if GitHub CLI is available - it should already be authenticated via gh auth login
-            version_result = subprocess.run(['gh', '--version'], capture_output=True, text=True, check=True)
-            print(f"    🔧 GitHub CLI version: {version_result.stdout.strip().split()[2] if len(version_result.stdout.strip().split()) > 2 else 'unknown'}")
-        except (subprocess.CalledProcessError, FileNotFoundError) as e:
-            print(f"    ⚠️  GitHub CLI (gh) not found or not authenticated: {e}")
-            print(f"    💡 Install with: brew install gh && gh auth login")
+        Returns the repositories that still have further pages.
+        """
+        variables = {}
+        for i, repo in enumerate(batch):
+            owner, _, name = repo['nameWithOwner'].partition('/')
+            variables[f"owner{i}"] = owner or self.organization
+            variables[f"name{i}"] = name or repo['name']
+            variables[f"after{i}"] = repo['collaborators']['pageInfo']['endCursor']
+        
+        data = self.execute_graphql_query(_batched_collaborators_query(len(batch)), variables)
+        if not data:
             return []
         
-        # Check GitHub CLI authentication status and token availability
-        try:
-            # Check what tokens are available
-            rel_token = os.getenv('REL_TOKEN')
-            github_pat = os.getenv('GITHUB_PAT') 
-            github_token = os.getenv('GITHUB_TOKEN')
+        unfinished = []
+        for i, repo in enumerate(batch):
+            page = (data.get(f"r{i}") or {}).get('collaborators')
+            if not page:
+                continue
+            embedded = repo['collaborators']
+            embedded['edges'].extend(page['edges'])
+            embedded['pageInfo'] = page['pageInfo']
+            embedded['totalCount'] = page['totalCount']
+            if page['pageInfo']['hasNextPage']:
+                unfinished.append(repo)
+        
+        return unfinished
+    
+    def _parse_collaborators(self, collaborators_data: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Convert one page of a GraphQL collaborators connection into collaborator records."""
+        collaborators = []
+        
+        # Each edge carries the permission alongside the collaborator node. Fields selected by
+        # CollaboratorConnectionFields are always present, so only the `... on User` fields use .get()
+        for edge in collaborators_data.get('edges', []):
+            collaborator = edge['node'] if edge else None
+            if not collaborator:
+                continue
+                
+            login = collaborator['login']
+            if not login:
+                continue
+                
+            collaborator_data = {
+                'login': login,
+                'name': collaborator['name'],
+                'email': '',  # Email not accessible with current token scopes
+                'permission': edge['permission'],
+                'type': collaborator['__typename'],
+                'company': collaborator.get('company', ''),
+                'location': collaborator.get('location', '')
+            }
+            collaborators.append(collaborator_data)
+        
+        return collaborators
+
+    def _prime_team_index(self, org: str):
+        """Fetch every organization team once and index team access by repository.
+        
+        Teams and their repository lists are paginated; the result is inverted into
+        ``nameWithOwner -> [team records]`` so per-repository lookups need no API calls.
+        A teams page that times out or hits a 502/504 is requested again with fewer teams.
+        Only a token without access to the team list leaves the index empty; any other
+        failed page sets ``team_index_incomplete``.
+        """
+        print(f"👥 Building team access index for organization: {org}...")
+        teams_by_repo = {}
+        team_count = 0
+        has_next_page = True
+        after_cursor = None
+        # Each team embeds up to 100 repositories, so a full page can be 10,000 nodes
+        max_page_size = 100
+        min_page_size = 10
+        page_size = max_page_size
+        
+        while has_next_page:
+            outcome = {}
+            data = self.execute_graphql_query(_Q_TEAMS, {"org": org, "first": page_size, "after": after_cursor},
+                                              shrinkable=page_size > min_page_size, outcome=outcome)
             
-            print(f"    🔧 Token availability:")
-            print(f"    - REL_TOKEN: {'✅ Available' if rel_token else '❌ Not set'}")
-            print(f"    - GITHUB_PAT: {'✅ Available' if github_pat else '❌ Not set'}")
-            print(f"    - GITHUB_TOKEN: {'✅ Available' if github_token else '❌ Not set'}")
+            if not data and outcome.get('failure') == 'size' and page_size > min_page_size:
+                page_size = max(min_page_size, page_size // 2)
+                print(f"⚠️  Teams page failed, retrying with {page_size} teams per page...")
+                if outcome.get('retry_after'):
+                    print(f"⏳ Server asked to wait {outcome['retry_after']:.1f}s before retrying...")
+                    self._stop.wait(outcome['retry_after'])
+                continue
             
-            # If REL_TOKEN is available but GitHub CLI might not be using it, let's set GH_TOKEN temporarily
-            if rel_token:
-                env['GH_TOKEN'] = rel_token
-                print(f"    🔧 Setting GH_TOKEN environment variable for this request")
+            if not data or not data.get('organization') or not data['organization'].get('teams'):
+                error_types = outcome.get('error_types')
+                if error_types and error_types <= _TEAM_SCOPE_ERRORS:
+                    print("⚠️  Token cannot list organization teams - team access will be missing from the report")
+                    print("💡 Ensure your token has the 'read:org' scope")
+                else:
+                    print("❌ Failed to fetch organization teams - team access in the report would be incomplete")
+                    self.team_index_incomplete = True
+                break
+                
+            teams_data = data['organization']['teams']
+            teams = [team for team in teams_data.get('nodes', []) if team and team.get('slug')]
+            team_count += len(teams)
             
-            auth_result = subprocess.run(['gh', 'auth', 'status'], capture_output=True, text=True, timeout=10, env=env)
-            if auth_result.returncode != 0:
-                print(f"    🔐 GitHub CLI auth status: {auth_result.stderr.strip()}")
+            # Teams with access to more than 100 repositories page through the rest concurrently;
+            # map() keeps the team order so the index is built deterministically
+            team_edges = functools.partial(self._team_repository_edges, org)
+            if any(((team.get('repositories') or {}).get('pageInfo') or {}).get('hasNextPage') for team in teams):
+                with self._worker_pool(self._governor.concurrency) as executor:
+                    edges_per_team = list(executor.map(team_edges, teams))
             else:
-                print(f"    ✅ GitHub CLI authenticated")
+                edges_per_team = list(map(team_edges, teams))
             
-            # Test basic API access via GitHub CLI with explicit token
-            test_result = subprocess.run(['gh', 'api', '/user', '--jq', '.login'], 
-                                       capture_output=True, text=True, timeout=10, env=env)
-            if test_result.returncode == 0:
-                username = test_result.stdout.strip()
-                print(f"    ✅ GitHub CLI authenticated as user: {username}")
-            else:
-                print(f"    ❌ GitHub CLI authentication test failed: {test_result.stderr.strip()}")
-                print(f"    💡 This may indicate insufficient token permissions")
-                # If auth failed with REL_TOKEN, fall back to default environment  
-                if 'GH_TOKEN' in env:
-                    print(f"    🔧 Falling back to default GitHub CLI authentication")
-                    env = os.environ.copy()
+            for team, edges in zip(teams, edges_per_team):
+                for edge in edges:
+                    if not edge or not edge.get('node'):
+                        continue
+                    teams_by_repo.setdefault(edge['node']['nameWithOwner'], []).append({
+                        'login': f"@{org}/{team['slug']}",
+                        'name': team.get('name', ''),
+                        'email': '',
+                        'permission': edge.get('permission', 'read'),
+                        'type': 'Team',
+                        'company': '',
+                        'location': ''
+                    })
+            
+            page_info = teams_data.get('pageInfo', {})
+            has_next_page = page_info.get('hasNextPage', False)
+            after_cursor = page_info.get('endCursor')
+        
+        self._teams_by_repo = teams_by_repo
+        print(f"✅ Indexed {team_count} teams with access to {len(teams_by_repo)} repositories")
+    
+    def _team_repository_edges(self, org: str, team: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Return all repository edges of a team, fetching the pages beyond the embedded first one."""
+        repositories = team.get('repositories') or {}
+        edges = list(repositories.get('edges', []))
+        
+        page_info = repositories.get('pageInfo', {})
+        if page_info.get('hasNextPage'):
+            edges.extend(self._fetch_remaining_team_repositories(org, team['slug'], page_info.get('endCursor')))
+        return edges
+    
+    def _fetch_remaining_team_repositories(self, org: str, team_slug: str, after_cursor: str) -> List[Dict[str, Any]]:
+        """Fetch the repository edges of a team beyond its first page."""
+        edges = []
+        has_next_page = True
+        
+        while has_next_page:
+            data = self.execute_graphql_query(_Q_TEAM_REPOSITORIES, {"org": org, "slug": team_slug, "after": after_cursor})
+            
+            team = (data.get('organization') or {}).get('team') if data else None
+            if not team or not team.get('repositories'):
+                print(f"    ❌ Failed to fetch all repositories for team {team_slug}")
+                self.team_index_incomplete = True
+                break
                 
-        except Exception as e:
-            print(f"    ⚠️  Could not check auth status: {e}")
-            # Ensure env is always defined
-            env = os.environ.copy()
+            repositories = team['repositories']
+            edges.extend(repositories.get('edges', []))
+            page_info = repositories.get('pageInfo', {})
+            has_next_page = page_info.get('hasNextPage', False)
+            after_cursor = page_info.get('endCursor')
+        
+        return edges
+
+    def fetch_teams_for_repo(self, repo_full_name: str) -> List[Dict[str, Any]]:
+        """Return the teams with access to a specific repository from the organization team index."""
+        if self._teams_by_repo is None:
+            self._prime_team_index(self.organization)
+        return list(self._teams_by_repo.get(repo_full_name, []))
+
+    def _process_repository(self, repo: Dict[str, Any]) -> Dict[str, Any]:
+        """Build the repository record with its direct collaborators and teams.
+        
+        The first collaborators page comes embedded in the repository listing; further
+        pages are only requested when the repository has more than 100 collaborators.
+        """
+        repo_data = {
+            'name': repo['name'],
+            'full_name': repo['nameWithOwner'],
+            'owner': repo['nameWithOwner'].partition('/')[0] or self.organization,
+            'is_private': repo['isPrivate'],
+            'is_archived': repo['isArchived'],
+            'is_fork': repo['isFork'],
+            'is_disabled': repo['isDisabled'],
+            'updated_at': repo['updatedAt'],
+            'created_at': repo['createdAt'],
+            'collaborators': []
+        }
         
-        print(f"    🔍 Querying teams via GitHub CLI for {repo_full_name}...")
-        all_teams = []
+        # Fetch direct collaborators for this repository
+        print(f"  👤 Fetching direct collaborators for {repo['name']}...")
+        collaborators = []
+        if 'collaborators' in repo and repo['collaborators'] is None:
+            # The listing returned the field as null (FORBIDDEN without push access); a separate
+            # collaborators query would be refused as well, so the repository is skipped
+            print(f"    🔒 {repo['name']}: Collaborators not accessible with this token")
+        else:
+            try:
+                collaborators = self.fetch_all_collaborators_for_repo(repo['name'], repo_data['owner'], repo.get('collaborators'))
+                if collaborators:
+                    print(f"    ✅ {repo['name']}: Found {len(collaborators)} direct collaborators")
+                else:
+                    print(f"    👤 {repo['name']}: No direct collaborators found")
+            except Exception as e:
+                print(f"    ❌ {repo['name']}: Failed to fetch collaborators: {e}")
         
-        # Use the env we set up in the authentication section
-        # Strategy 1: Try the direct repo teams endpoint
+        # Fetch teams with access to this repository
+        print(f"  👥 Fetching teams for {repo['name']}...")
+        teams = []
         try:
-            cmd = [
-                'gh', 'api',
-                f'/repos/{repo_full_name}/teams',
-                '--paginate',
-                '--jq', '.[] | {id: .id, name: .name, slug: .slug, description: .description, privacy: .privacy, permission: .permission, url: .html_url}'
-            ]
-            
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=30, env=env)
-            
-            print(f"    🔧 Direct endpoint - Return code: {result.returncode}")
-            if result.stderr:
-                print(f"    🔧 Direct endpoint - STDERR: {result.stderr.strip()}")
-            if result.stdout:
-                print(f"    🔧 Direct endpoint - STDOUT length: {len(result.stdout)} chars")
-            
-            if result.returncode == 0 and result.stdout.strip():
-                print(f"    ✅ Found teams via direct endpoint")
-                all_teams.extend(self._parse_team_output(result.stdout))
+            teams = self.fetch_teams_for_repo(repo['nameWithOwner'])
+            if teams:
+                print(f"    ✅ {repo['name']}: Found {len(teams)} teams with access")
             else:
-                print(f"    📝 Direct endpoint returned no teams")
-                
+                print(f"    👥 {repo['name']}: No teams found with access")
         except Exception as e:
-            print(f"    ⚠️  Direct endpoint failed: {e}")
+            print(f"    ❌ {repo['name']}: Failed to fetch teams: {e}")
         
-        if not all_teams:
-            print(f"    � No team permissions found for {repo_name} using direct repository teams endpoint")
-            print(f"    💡 Repository may not have any team permissions configured, or teams may not be accessible")
+        # Combine collaborators and teams
+        repo_data['collaborators'] = collaborators + teams
+        total_access = len(collaborators) + len(teams)
+        
+        if total_access > 0:
+            print(f"    📋 {repo['name']}: Total access entries: {total_access} ({len(collaborators)} users + {len(teams)} teams)")
         else:
-            print(f"    ✅ Found {len(all_teams)} team(s) with access to {repo_name}")
-            
-        return all_teams
+            print(f"    ⚠️  {repo['name']}: No direct access found (may be access restricted or owner-only)")
         
-    def _parse_team_output(self, output: str) -> List[Dict[str, Any]]:
-        """Parse team data from GitHub CLI output."""
-        teams = []
-        for line in output.strip().split('\n'):
-            if line.strip():
-                try:
-                    team_data = json.loads(line)
-                    formatted_team = {
-                        'login': f"@{self.organization}/{team_data.get('slug', '')}",
-                        'name': team_data.get('name', ''),
-                        'email': '',
-                        'avatar_url': '',
-                        'url': team_data.get('url', ''),
-                        'permission': team_data.get('permission', 'read'),
-                        'type': 'Team',
-                        'id': str(team_data.get('id', '')),
-                        'company': '',
-                        'location': '',
-                        'team_slug': team_data.get('slug', ''),
-                        'team_description': team_data.get('description', ''),
-                        'team_privacy': team_data.get('privacy', '')
-                    }
-                    teams.append(formatted_team)
-                except json.JSONDecodeError:
-                    continue
-        return teams
+        return repo_data
 
-    def fetch_repositories_with_collaborators(self, include_archived: bool = False) -> List[Dict[str, Any]]:
+    def fetch_repositories_with_collaborators(self, include_archived: bool = False,
+                                              sink: Optional[Callable[[Dict[str, Any]], None]] = None,
+                                              include_forks: bool = True) -> List[Dict[str, Any]]:
         """
         Fetch all repositories with their collaborators using GraphQL.
         This is much more efficient than the REST API approach.
+        
+        If ``sink`` is given, every repository record is passed to it as soon as its page
+        has been fetched, so callers can persist results incrementally.
         """
         all_repos_data = []
         has_next_page = True
         after_cursor = None
         page_num = 1
         
+        # Adaptive page size: start large, halve when a page fails or comes back slowly (e.g.
+        # gateway timeouts on collaborator-heavy pages) and double back after a few consecutive
+        # fast pages
+        max_page_size = 100
+        min_page_size = 10
+        slow_page_seconds = 10.0
+        fast_page_seconds = 3.0
+        page_size = max_page_size
+        successful_pages = 0
+        
         print(f"🚀 Fetching repositories with collaborators for organization: {self.organization}")
         print(f"🎯 Include archived repositories: {include_archived}")
+        print(f"🎯 Include forked repositories: {include_forks}")
         print("=" * 80)
         
-        self.check_rate_limit()
+        # The startup probe's rate limit status is only fresh once; later runs query it again
+        self.check_rate_limit(self._startup)
+        self._startup = None
+        self._prime_team_index(self.organization)
+        if self.team_index_incomplete:
+            print("❌ Team access could not be fully fetched - stopping")
+            return []
         
-        while has_next_page:
-            print(f"\n📄 Fetching page {page_num} of repositories...")
-            
-            # Simplified GraphQL query to get repositories without collaborators first
-            query = """
-            query($org: String!, $first: Int!, $after: String) {
-                organization(login: $org) {
-                    repositories(first: $first, after: $after, orderBy: {field: UPDATED_AT, direction: DESC}) {
-                        pageInfo {
-                            hasNextPage
-                            endCursor
-                        }
-                        totalCount
-                        nodes {
-                            name
-                            nameWithOwner
-                            isPrivate
-                            isArchived
-                            isFork
-                            isDisabled
-                            updatedAt
-                            createdAt
-                        }
-                    }
-                }
-            }
-            """
-            
+        def fetch_page(cursor: Optional[str], size: int, delay: float = 0.0) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+            """Fetch one repositories page; returns the response data and the query outcome."""
+            if delay > 0:
+                self._stop.wait(delay)
             variables = {
                 "org": self.organization,
-                "first": 25,  # Reduced from 50 to 25 to avoid large query timeouts
-                "after": after_cursor
+                "first": size,
+                "after": cursor,
+                # Excluded repositories are filtered by GitHub instead of fetched and discarded
+                "isArchived": None if include_archived else False,
+                "isFork": None if include_forks else False
             }
-            
-            print(f"🔄 Executing GraphQL query (attempt may include retries)...")
-            data = self.execute_graphql_query(query, variables)
-            
-            if not data:
-                print(f"⚠️  No data returned for page {page_num}, this might be due to server errors.")
-                if page_num == 1:
-                    print("❌ Failed to fetch any repository data - stopping")
-                    break
-                else:
-                    print("⚠️  Continuing with partial data from previous pages")
-                    break
-            
-            if 'organization' not in data:
-                print("❌ No organization data in response")
-                if page_num == 1:
-                    print("❌ Failed to access organization - stopping")
-                    break
+            # Above the minimum size a timeout or 502/504 shrinks the page instead of retrying the
+            # same request; rate limits, auth failures and other errors keep the normal handling
+            outcome = {}
+            data = self.execute_graphql_query(_Q_REPOS_PAGE, variables,
+                                              shrinkable=size > min_page_size, outcome=outcome)
+            return data, outcome
+        
+        # Cursors are sequential, so pages cannot be fetched in parallel; instead the next page is
+        # requested in the background while the current page's repositories are being processed
+        prefetched = None
+        with self._worker_pool(1) as page_fetcher:
+            while has_next_page:
+                if prefetched is not None:
+                    print(f"\n📄 Receiving prefetched page {page_num} of repositories...")
+                    data, outcome = prefetched.result()
+                    prefetched = None
                 else:
-                    print("⚠️  Continuing with partial data from previous pages")
+                    print(f"\n📄 Fetching page {page_num} of repositories...")
+                    print(f"🔄 Executing GraphQL query ({page_size} repositories per page, attempt may include retries)...")
+                    data, outcome = fetch_page(after_cursor, page_size)
+                
+                if not data and outcome.get('failure') == 'size' and page_size > min_page_size:
+                    page_size = max(min_page_size, page_size // 2)
+                    successful_pages = 0
+                    print(f"⚠️  Page {page_num} failed, retrying with {page_size} repositories per page...")
+                    # Honor a Retry-After sent with the failed response before resending
+                    if outcome.get('retry_after'):
+                        print(f"⏳ Server asked to wait {outcome['retry_after']:.1f}s before retrying...")
+                        self._stop.wait(outcome['retry_after'])
+                    continue
+                
+                if not data and self.access_denied:
+                    print("❌ The token is being refused by the API - stopping")
                     break
                 
-            org_data = data['organization']
-            if not org_data or 'repositories' not in org_data:
-                print("❌ No repository data found")
-                break
+                if not data:
+                    print(f"⚠️  No data returned for page {page_num}, this might be due to server errors.")
+                    if page_num == 1:
+                        print("❌ Failed to fetch any repository data - stopping")
+                        break
+                    else:
+                        print("⚠️  Continuing with partial data from previous pages")
+                        break
                 
-            repos = org_data['repositories']
-            page_info = repos['pageInfo']
-            repo_nodes = repos['nodes']
-            
-            print(f"✅ Found {len(repo_nodes)} repositories on page {page_num}")
-            print(f"📊 Total repositories in org: {repos['totalCount']:,}")
-            
-            # Process each repository
-            processed_repos = 0
-            skipped_repos = 0
-            for repo in repo_nodes:
-                # Skip if repo data is incomplete (access denied)
-                if not repo or not repo.get('name'):
-                    skipped_repos += 1
-                    continue
+                if 'organization' not in data:
+                    print("❌ No organization data in response")
+                    if page_num == 1:
+                        print("❌ Failed to access organization - stopping")
+                        break
+                    else:
+                        print("⚠️  Continuing with partial data from previous pages")
+                        break
                     
-                # Filter archived repositories if not including them
-                if not include_archived and repo.get('isArchived', False):
-                    continue
+                org_data = data['organization']
+                if not org_data or 'repositories' not in org_data:
+                    print("❌ No repository data found")
+                    break
                     
-                repo_data = {
-                    'name': repo['name'],
-                    'full_name': repo['nameWithOwner'],
-                    'is_private': repo['isPrivate'],
-                    'is_archived': repo['isArchived'],
-                    'is_fork': repo['isFork'],
-                    'is_disabled': repo['isDisabled'],
-                    'updated_at': repo['updatedAt'],
-                    'created_at': repo['createdAt'],
-                    'collaborators': []
-                }
+                repos = org_data['repositories']
+                page_info = repos['pageInfo']
+                repo_nodes = repos['nodes']
                 
-                # Fetch direct collaborators for this repository
-                print(f"  � Fetching direct collaborators for {repo['name']}...")
-                collaborators = []
-                try:
-                    collaborators = self.fetch_all_collaborators_for_repo(repo['name'], repo['nameWithOwner'])
-                    if collaborators:
-                        print(f"    ✅ Found {len(collaborators)} direct collaborators")
-                    else:
-                        print(f"    👤 No direct collaborators found")
-                except Exception as e:
-                    print(f"    ❌ Failed to fetch collaborators: {e}")
+                print(f"✅ Found {len(repo_nodes)} repositories on page {page_num}")
+                print(f"📊 Total matching repositories in org: {repos['totalCount']:,}")
+                # Latency of the successful round trip only, so rate limit waits and retries
+                # do not count as a slow page
+                latency = outcome.get('latency', 0.0)
+                cost = (data.get('rateLimit') or {}).get('cost')
+                print(f"⏱️  Page {page_num} took {latency:.1f}s" + (f" (query cost {cost})" if cost is not None else ""))
                 
-                # Fetch teams with access to this repository
-                print(f"  👥 Fetching teams for {repo['name']}...")
-                teams = []
-                try:
-                    teams = self.fetch_teams_for_repo(repo['name'], repo['nameWithOwner'])
-                    if teams:
-                        print(f"    ✅ Found {len(teams)} teams with access")
-                    else:
-                        print(f"    👥 No teams found with access")
-                except Exception as e:
-                    print(f"    ❌ Failed to fetch teams: {e}")
+                # Shrink before slow pages turn into timeouts; grow back after 3 consecutive fast pages
+                if latency > slow_page_seconds and page_size > min_page_size:
+                    page_size = max(min_page_size, page_size // 2)
+                    successful_pages = 0
+                    print(f"🐢 Slow page, reducing to {page_size} repositories per page")
+                elif latency < fast_page_seconds:
+                    successful_pages += 1
+                    if page_size < max_page_size and successful_pages >= 3:
+                        page_size = min(max_page_size, page_size * 2)
+                        successful_pages = 0
                 
-                # Combine collaborators and teams
-                repo_data['collaborators'] = collaborators + teams
-                total_access = len(collaborators) + len(teams)
+                # Update pagination and start fetching the next page right away
+                has_next_page = page_info['hasNextPage']
+                after_cursor = page_info['endCursor']
+                if has_next_page:
+                    # Adaptive delay between pages; grows only after 5xx responses or secondary rate limits
+                    delay = self._governor.delay
+                    if delay > 0:
+                        print(f"⏳ Delaying next page by {delay:.1f} seconds to ease API pressure...")
+                    print(f"🔄 Prefetching page {page_num + 1} ({page_size} repositories per page)...")
+                    prefetched = page_fetcher.submit(fetch_page, after_cursor, page_size, delay)
                 
-                if total_access > 0:
-                    print(f"    📋 Total access entries: {total_access} ({len(collaborators)} users + {len(teams)} teams)")
-                else:
-                    print(f"    ⚠️  No direct access found (may be access restricted or owner-only)")
+                # Filter out repositories we cannot process
+                page_repos = []
+                skipped_repos = 0
+                for repo in repo_nodes:
+                    # Skip if repo data is incomplete (access denied)
+                    if not repo or not repo.get('name'):
+                        skipped_repos += 1
+                        continue
+                        
+                    page_repos.append(repo)
                 
-                all_repos_data.append(repo_data)
-                processed_repos += 1
+                # Batch the follow-up collaborator pages of large repositories, then resolve
+                # teams (and any leftover pages) concurrently; map() keeps the original order
+                self._fetch_collaborator_overflow(page_repos)
+                with self._worker_pool(self._governor.concurrency) as executor:
+                    page_repos_data = list(executor.map(self._process_repository, page_repos))
                 
-            if skipped_repos > 0:
-                print(f"⚠️  Skipped {skipped_repos} repositories due to access restrictions")
-            print(f"📈 Progress: Processed {len(all_repos_data)} repositories so far")
-            print(f"🔄 GraphQL queries made: {self.total_queries}")
-            print(f"📊 Rate limit remaining: {self.rate_limit_remaining}")
-            
-            # Update pagination
-            has_next_page = page_info['hasNextPage']
-            after_cursor = page_info['endCursor']
-            page_num += 1
-            
-            # Small delay between pages to avoid overwhelming the API
-            if has_next_page:
-                print(f"⏳ Pausing 2 seconds before next page to ensure API stability...")
-                time.sleep(2)
+                if sink:
+                    for repo_data in page_repos_data:
+                        sink(repo_data)
+                all_repos_data.extend(page_repos_data)
+                    
+                if skipped_repos > 0:
+                    print(f"⚠️  Skipped {skipped_repos} repositories due to access restrictions")
+                print(f"📈 Progress: Processed {len(all_repos_data)} repositories so far")
+                print(f"🔄 GraphQL queries made: {self.total_queries}")
+                print(f"📊 Rate limit remaining: {self.rate_limit_remaining}")
+                print(f"⚙️  Concurrency: {self._governor.concurrency} workers, page delay {self._governor.delay:.1f}s")
+                
+                page_num += 1
         
         if not all_repos_data:
             print("\n❌ No repository data was successfully fetched!")
@@ -674,11 +1176,19 @@ class GitHubGraphQLPermissionsFetcher:
         print(f"\n🎉 REPOSITORY FETCH COMPLETE!")
         print(f"⏱️  Total fetch time: {elapsed_time}")
         
-        # Calculate comprehensive statistics
-        total_access_entries = sum(len(repo['collaborators']) for repo in all_repos_data)
-        total_users = sum(len([c for c in repo['collaborators'] if c['type'] != 'Team']) for repo in all_repos_data)
-        total_teams = sum(len([c for c in repo['collaborators'] if c['type'] == 'Team']) for repo in all_repos_data)
-        repos_with_access = sum(1 for repo in all_repos_data if repo['collaborators'])
+        # Calculate comprehensive statistics in a single pass over all collaborators
+        total_access_entries = total_teams = repos_with_access = 0
+        for repo in all_repos_data:
+            collaborators = repo['collaborators']
+            if not collaborators:
+                continue
+            repos_with_access += 1
+            total_access_entries += len(collaborators)
+            for collaborator in collaborators:
+                if collaborator['type'] == 'Team':
+                    total_teams += 1
+            
+        total_users = total_access_entries - total_teams
         repos_without_access = len(all_repos_data) - repos_with_access
         
         print(f"📊 Final statistics (DIRECT access only):")
@@ -703,147 +1213,207 @@ class GitHubGraphQLPermissionsFetcher:
         print(f"\n📝 Note: This report shows DIRECT collaborators and teams only")
         print(f"   • Excludes organization-wide inherited permissions")
         print(f"   • Shows explicit repository-level access grants")
-        print(f"   • Teams are included with accurate permissions via GitHub CLI")
-        print(f"   • Install GitHub CLI (gh) for complete team permission data")
+        print(f"   • Teams are included with their repository permissions from the organization team list")
         
         return all_repos_data
     
-    def process_repositories_to_permissions(self, repos_data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """Convert repository data with collaborators to flat permission records."""
-        print(f"\n🔄 Converting {len(repos_data)} repositories to permission records...")
+    def repository_permission_rows(self, repo: Dict[str, Any]) -> Iterator[tuple]:
+        """Yield one repository's permission rows as tuples in PERMISSION_FIELDNAMES order.
         
-        user_repo_permissions = []
-        total_collaborators = 0
-        unique_users = set()
+        Rows are generated lazily so the streaming writer never holds more than one row.
+        """
+        # Repository-level fields are identical for every collaborator; take them once
+        name, full_name = repo['name'], repo['full_name']
+        repo_fields = (repo['is_private'], repo['is_archived'], repo['is_fork'], repo['is_disabled'],
+                       repo['updated_at'], repo['created_at'], 'graphql')
+        
+        for collaborator in repo['collaborators']:
+            yield (
+                collaborator['login'], collaborator['name'], collaborator['email'], collaborator['type'],
+                collaborator['company'], collaborator['location'], name, full_name,
+                _lower_permission(collaborator['permission'])
+            ) + repo_fields
+    
+    def process_repositories_to_permissions(self, repos_data: List[Dict[str, Any]]) -> pd.DataFrame:
+        """Convert repository data with collaborators to a flat permission-records DataFrame.
         
-        for repo in repos_data:
-            repo_name = repo['name']
-            repo_full_name = repo['full_name']
-            
-            for collaborator in repo['collaborators']:
-                username = collaborator['login']
-                user_type = collaborator['type']
-                permission = collaborator['permission']
-                
-                # Create permission record
-                permission_record = {
-                    'username': username,
-                    'user_name': collaborator['name'],
-                    'user_email': collaborator['email'],
-                    'user_type': user_type,
-                    'user_company': collaborator['company'],
-                    'user_location': collaborator['location'],
-                    'repo_name': repo_name,
-                    'repo_full_name': repo_full_name,
-                    'permission': permission.lower() if permission else 'unknown',
-                    'is_private_repo': repo['is_private'],
-                    'is_archived_repo': repo['is_archived'],
-                    'is_fork_repo': repo['is_fork'],
-                    'is_disabled_repo': repo['is_disabled'],
-                    'repo_updated_at': repo['updated_at'],
-                    'repo_created_at': repo['created_at'],
-                    'data_source': 'graphql'
-                }
-                
-                user_repo_permissions.append(permission_record)
-                unique_users.add(username)
-                total_collaborators += 1
+        Collaborator columns are built with one comprehension each; repository columns are
+        taken once per repository and expanded with np.repeat into arrays of the exact record
+        count. Columns follow PERMISSION_FIELDNAMES.
+        """
+        print(f"\n🔄 Converting {len(repos_data)} repositories to permission records...")
+        
+        counts = [len(repo['collaborators']) for repo in repos_data]
+        total_records = sum(counts)
+        collaborators = [collaborator for repo in repos_data for collaborator in repo['collaborators']]
+        
+        def per_record(key: str, dtype=object) -> np.ndarray:
+            """Repeat a repository field once for each of the repository's collaborators."""
+            return np.repeat(np.array([repo[key] for repo in repos_data], dtype=dtype), counts)
+        
+        permissions_df = pd.DataFrame({
+            'username': [c['login'] for c in collaborators],
+            'user_name': [c['name'] for c in collaborators],
+            'user_email': [c['email'] for c in collaborators],
+            'user_type': [c['type'] for c in collaborators],
+            'user_company': [c['company'] for c in collaborators],
+            'user_location': [c['location'] for c in collaborators],
+            'repo_name': per_record('name'),
+            'repo_full_name': per_record('full_name'),
+            'permission': [_lower_permission(c['permission']) for c in collaborators],
+            'is_private_repo': per_record('is_private', bool),
+            'is_archived_repo': per_record('is_archived', bool),
+            'is_fork_repo': per_record('is_fork', bool),
+            'is_disabled_repo': per_record('is_disabled', bool),
+            'repo_updated_at': per_record('updated_at'),
+            'repo_created_at': per_record('created_at'),
+            'data_source': 'graphql'
+        }, columns=PERMISSION_FIELDNAMES)
+        
+        # Optional profile fields may be null; keep them as empty strings like the CSV output
+        optional_columns = ['user_name', 'user_email', 'user_company', 'user_location']
+        permissions_df[optional_columns] = permissions_df[optional_columns].fillna('')
+        
+        # Low-cardinality, heavily repeated text columns are stored dictionary-encoded
+        for column in ('user_type', 'permission', 'user_company', 'user_location', 'data_source',
+                       'repo_name', 'repo_full_name'):
+            permissions_df[column] = permissions_df[column].astype('category')
         
         print(f"✅ Conversion complete:")
-        print(f"   • Permission records: {len(user_repo_permissions):,}")
-        print(f"   • Unique users: {len(unique_users):,}")
-        print(f"   • Total collaborator instances: {total_collaborators:,}")
+        print(f"   • Permission records: {len(permissions_df):,}")
+        print(f"   • Unique users: {permissions_df['username'].nunique():,}")
+        print(f"   • Total collaborator instances: {total_records:,}")
+        
+        return permissions_df
+    
+    def _derive_permission_columns(self, permissions_data: pd.DataFrame) -> pd.DataFrame:
+        """Add the lowercase sort keys and per-record flags shared by the CSV builders.
+        
+        Returns the frame unchanged if the columns were already derived, so the builders
+        can be called on their own or fed one shared frame by create_output_csvs.
+        """
+        if 'username_lc' in permissions_data.columns:
+            return permissions_data
+        
+        # Repository names repeat once per collaborator; lowercase each distinct name once
+        # and expand through the category codes instead of lowercasing every record
+        repo_names = permissions_data['repo_name'].astype('category')
+        repo_name_lc = repo_names.cat.categories.astype(str).str.lower().take(repo_names.cat.codes)
+        
+        return permissions_data.assign(
+            username_lc=permissions_data['username'].astype(str).str.lower(),
+            repo_name_lc=repo_name_lc.to_numpy(),
+            is_public=~permissions_data['is_private_repo'].astype(bool),
+            is_original=~permissions_data['is_fork_repo'].astype(bool)
+        )
+    
+    def create_output_csvs(self, permissions_data: pd.DataFrame, repos_data: List[Dict[str, Any]],
+                           permissions_output: str, summary_output: str, repo_summary_output: str):
+        """Create the detailed, user summary and repository summary CSVs from one derived frame.
         
-        return user_repo_permissions
+        The three files are independent and only read the shared frame, so they are written
+        concurrently; sorting, grouping and file I/O release the GIL for much of their work.
+        """
+        derived = self._derive_permission_columns(permissions_data)
+        
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            futures = [
+                executor.submit(self.create_user_permissions_csv, derived, permissions_output),
+                executor.submit(self.create_user_summary_csv, derived, summary_output),
+                executor.submit(self.create_repository_summary_csv, repos_data, repo_summary_output, derived)
+            ]
+            # Re-raise the first failure, if any
+            for future in futures:
+                future.result()
     
-    def create_user_permissions_csv(self, permissions_data: List[Dict[str, Any]], output_file: str):
+    def create_user_permissions_csv(self, permissions_data: pd.DataFrame, output_file: str):
         """Create CSV file with user permissions."""
         print(f"\n📝 Creating detailed permissions file: {output_file}")
         
-        fieldnames = [
-            'username', 'user_name', 'user_email', 'user_type', 'user_company', 'user_location',
-            'repo_name', 'repo_full_name', 'permission', 
-            'is_private_repo', 'is_archived_repo', 'is_fork_repo', 'is_disabled_repo',
-            'repo_updated_at', 'repo_created_at', 'data_source'
-        ]
+        # Sort by username, then by repo name (case-insensitive, stable) on precomputed lowercase keys
+        sorted_data = self._derive_permission_columns(permissions_data).sort_values(
+            ['username_lc', 'repo_name_lc'], kind='mergesort'
+        )
         
-        with open(output_file, 'w', newline='', encoding='utf-8') as csvfile:
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            writer.writeheader()
-            
-            # Sort by username, then by repo name
-            sorted_data = sorted(permissions_data, 
-                               key=lambda x: (x['username'].lower(), x['repo_name'].lower()))
-            
-            for row in sorted_data:
-                writer.writerow(row)
+        # pandas' C CSV writer formats whole chunks of rows at a time. The sorted file is written
+        # next to the target and swapped in atomically, so the report name only ever holds a
+        # complete file (an earlier good report stays in place if this rewrite is interrupted)
+        temp_file = f"{output_file}.tmp"
+        try:
+            with open(temp_file, 'w', newline='', encoding='utf-8', buffering=_CSV_BUFFER_SIZE) as csvfile:
+                sorted_data.to_csv(csvfile, columns=PERMISSION_FIELDNAMES, index=False, lineterminator='\r\n', chunksize=50_000)
+            os.replace(temp_file, output_file)
+        except BaseException:
+            # Don't leave a half-written temp file behind; the original error is re-raised
+            try:
+                os.remove(temp_file)
+            except OSError:
+                pass
+            raise
         
         print(f"✅ Created detailed permissions file: {output_file}")
     
-    def create_user_summary_csv(self, permissions_data: List[Dict[str, Any]], output_file: str):
+    def create_user_permissions_parquet(self, permissions_data: pd.DataFrame, output_file: str) -> bool:
+        """Write the detailed permission records to a snappy-compressed Parquet file.
+        
+        Requires the optional pyarrow package; categorical columns are stored as Parquet
+        dictionary columns. Returns False (and skips the file) when pyarrow is missing.
+        """
+        print(f"\n📝 Creating detailed permissions Parquet file: {output_file}")
+        
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            print("⚠️  pyarrow is not installed; skipping Parquet output (pip install pyarrow)")
+            return False
+        
+        sorted_data = self._derive_permission_columns(permissions_data).sort_values(
+            ['username_lc', 'repo_name_lc'], kind='mergesort'
+        )
+        sorted_data[PERMISSION_FIELDNAMES].to_parquet(output_file, engine='pyarrow', compression='snappy', index=False)
+        
+        print(f"✅ Created detailed permissions Parquet file: {output_file}")
+        return True
+    
+    def create_user_summary_csv(self, permissions_data: pd.DataFrame, output_file: str):
         """Create a summary CSV showing each user's total repository access."""
         print(f"\n📝 Creating user summary file: {output_file}")
         
-        # Group by user
-        user_summary = {}
-        
-        for perm in permissions_data:
-            username = perm['username']
-            if username not in user_summary:
-                user_summary[username] = {
-                    'username': username,
-                    'user_name': perm['user_name'],
-                    'user_email': perm['user_email'],
-                    'user_type': perm['user_type'],
-                    'user_company': perm['user_company'],
-                    'user_location': perm['user_location'],
-                    'total_repos': 0,
-                    'admin_repos': 0,
-                    'maintain_repos': 0,
-                    'write_repos': 0,
-                    'triage_repos': 0,
-                    'read_repos': 0,
-                    'private_repos': 0,
-                    'public_repos': 0,
-                    'archived_repos': 0,
-                    'fork_repos': 0,
-                    'original_repos': 0,
-                    'disabled_repos': 0,
-                    'data_source': 'graphql'
-                }
-            
-            user_data = user_summary[username]
-            user_data['total_repos'] += 1
-            
-            # Count by permission level
-            perm_level = perm['permission']
-            if perm_level == 'admin':
-                user_data['admin_repos'] += 1
-            elif perm_level == 'maintain':
-                user_data['maintain_repos'] += 1
-            elif perm_level in ['write', 'push']:
-                user_data['write_repos'] += 1
-            elif perm_level == 'triage':
-                user_data['triage_repos'] += 1
-            elif perm_level in ['read', 'pull']:
-                user_data['read_repos'] += 1
-            
-            # Count by repo characteristics
-            if perm['is_private_repo']:
-                user_data['private_repos'] += 1
-            else:
-                user_data['public_repos'] += 1
-                
-            if perm['is_archived_repo']:
-                user_data['archived_repos'] += 1
-                
-            if perm['is_fork_repo']:
-                user_data['fork_repos'] += 1
-            else:
-                user_data['original_repos'] += 1
-                
-            if perm['is_disabled_repo']:
-                user_data['disabled_repos'] += 1
+        # Per-record flags, summed per user in one groupby aggregation
+        flags = self._derive_permission_columns(permissions_data)
+        
+        # Repository counts per permission level as one username x permission pivot; permission
+        # is categorical, so the bucket lookup runs once per distinct value rather than per record
+        permission_buckets = flags['permission'].astype('category').map(_PERM_BUCKET)
+        # Permissions outside the table (e.g. 'unknown') map to NaN and are dropped by crosstab;
+        # reindexing over every user keeps users with only such records at zero counts
+        permission_counts = pd.crosstab(flags['username'], permission_buckets).reindex(
+            index=flags['username'].unique(),
+            columns=['admin_repos', 'maintain_repos', 'write_repos', 'triage_repos', 'read_repos'], fill_value=0
+        ).astype('int64')
+        
+        # Group by user; profile fields come from the user's first record
+        user_summary = flags.groupby('username', sort=False).agg(
+            username_lc=('username_lc', 'first'),
+            user_name=('user_name', 'first'),
+            user_email=('user_email', 'first'),
+            user_type=('user_type', 'first'),
+            user_company=('user_company', 'first'),
+            user_location=('user_location', 'first'),
+            total_repos=('repo_name', 'size'),
+            private_repos=('is_private_repo', 'sum'),
+            public_repos=('is_public', 'sum'),
+            archived_repos=('is_archived_repo', 'sum'),
+            fork_repos=('is_fork_repo', 'sum'),
+            original_repos=('is_original', 'sum'),
+            disabled_repos=('is_disabled_repo', 'sum')
+        ).join(permission_counts).reset_index()
+        user_summary['data_source'] = 'graphql'
+        
+        # Sort by total repos descending, then by username
+        user_summary = user_summary.sort_values(
+            ['total_repos', 'username_lc'], ascending=[False, True], kind='mergesort'
+        )
         
         # Write summary CSV
         fieldnames = [
@@ -852,52 +1422,57 @@ class GitHubGraphQLPermissionsFetcher:
             'private_repos', 'public_repos', 'archived_repos', 'fork_repos', 'original_repos', 
             'disabled_repos', 'data_source'
         ]
-        
-        with open(output_file, 'w', newline='', encoding='utf-8') as csvfile:
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            writer.writeheader()
-            
-            # Sort by total repos descending, then by username
-            sorted_users = sorted(user_summary.values(), 
-                                key=lambda x: (-x['total_repos'], x['username'].lower()))
-            
-            for user in sorted_users:
-                writer.writerow(user)
+        with open(output_file, 'w', newline='', encoding='utf-8', buffering=_CSV_BUFFER_SIZE) as csvfile:
+            user_summary.to_csv(csvfile, columns=fieldnames, index=False, lineterminator='\r\n', chunksize=50_000)
         
         print(f"✅ Created user summary file: {output_file}")
         print(f"📊 Summary contains {len(user_summary)} unique users")
     
-    def create_repository_summary_csv(self, repos_data: List[Dict[str, Any]], output_file: str):
-        """Create a summary CSV of repositories with their collaborator counts."""
+    def create_repository_summary_csv(self, repos_data: List[Dict[str, Any]], output_file: str,
+                                      permissions_data: Optional[pd.DataFrame] = None):
+        """Create a summary CSV of repositories with their collaborator counts.
+        
+        When the permission records are passed in, per-repository permission counts come from
+        one groupby over them instead of a second walk over every repository's collaborators.
+        """
         print(f"\n📝 Creating repository summary file: {output_file}")
         
         repo_summary = []
+        pair_counts = None
+        if permissions_data is not None:
+            pair_counts = permissions_data.groupby(['repo_full_name', 'permission'], sort=False, observed=True).size().to_dict()
         
         for repo in repos_data:
             # Count permissions by type
-            permission_counts = {}
-            for collaborator in repo['collaborators']:
-                permission = collaborator['permission'].lower() if collaborator['permission'] else 'unknown'
-                permission_counts[permission] = permission_counts.get(permission, 0) + 1
-            
-            repo_data = {
-                'repo_name': repo['name'],
-                'repo_full_name': repo['full_name'],
-                'is_private': repo['is_private'],
-                'is_archived': repo['is_archived'],
-                'is_fork': repo['is_fork'],
-                'is_disabled': repo['is_disabled'],
-                'total_collaborators': len(repo['collaborators']),
-                'admin_users': permission_counts.get('admin', 0),
-                'maintain_users': permission_counts.get('maintain', 0),
-                'write_users': permission_counts.get('write', 0),
-                'triage_users': permission_counts.get('triage', 0),
-                'read_users': permission_counts.get('read', 0),
-                'updated_at': repo['updated_at'],
-                'created_at': repo['created_at']
-            }
+            if pair_counts is not None:
+                full_name = repo['full_name']
+                permission_counts = {
+                    level: pair_counts.get((full_name, level), 0)
+                    for level in ('admin', 'maintain', 'write', 'triage', 'read')
+                }
+            else:
+                permission_counts = Counter(
+                    _lower_permission(collaborator['permission'])
+                    for collaborator in repo['collaborators']
+                )
             
-            repo_summary.append(repo_data)
+            # Rows are tuples in fieldnames order, written with csv.writer.writerows
+            repo_summary.append((
+                repo['name'],
+                repo['full_name'],
+                repo['is_private'],
+                repo['is_archived'],
+                repo['is_fork'],
+                repo['is_disabled'],
+                len(repo['collaborators']),
+                permission_counts.get('admin', 0),
+                permission_counts.get('maintain', 0),
+                permission_counts.get('write', 0),
+                permission_counts.get('triage', 0),
+                permission_counts.get('read', 0),
+                repo['updated_at'],
+                repo['created_at']
+            ))
         
         fieldnames = [
             'repo_name', 'repo_full_name', 'is_private', 'is_archived', 'is_fork', 'is_disabled',
@@ -905,135 +1480,103 @@ class GitHubGraphQLPermissionsFetcher:
             'triage_users', 'read_users', 'updated_at', 'created_at'
         ]
         
-        with open(output_file, 'w', newline='', encoding='utf-8') as csvfile:
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            writer.writeheader()
-            
-            # Sort by total collaborators descending
-            sorted_repos = sorted(repo_summary, 
-                                key=lambda x: (-x['total_collaborators'], x['repo_name'].lower()))
-            
-            for repo in sorted_repos:
-                writer.writerow(repo)
+        # Sort by total collaborators descending, then by repository name
+        repo_summary.sort(key=lambda row: (-row[6], row[0].lower()))
+        
+        with open(output_file, 'w', newline='', encoding='utf-8', buffering=_CSV_BUFFER_SIZE) as csvfile:
+            writer = csv.writer(csvfile)
+            writer.writerow(fieldnames)
+            writer.writerows(repo_summary)
         
         print(f"✅ Created repository summary file: {output_file}")
     
-    def print_summary(self, permissions_data: List[Dict[str, Any]], repos_data: List[Dict[str, Any]]):
+    def print_summary(self, permissions_data: pd.DataFrame, repos_data: List[Dict[str, Any]]):
         """Print a comprehensive summary of the permissions data."""
         total_permissions = len(permissions_data)
-        unique_users = len(set(p['username'] for p in permissions_data))
         unique_repos = len(repos_data)
         
-        # Count by permission level and user type
-        permission_counts = {}
-        user_types = {}
-        team_count = 0
-        user_count = 0
-        
-        for perm in permissions_data:
-            perm_level = perm['permission']
-            permission_counts[perm_level] = permission_counts.get(perm_level, 0) + 1
-            
-            user_type = perm['user_type']
-            user_types[user_type] = user_types.get(user_type, 0) + 1
-            
-            if user_type == 'Team':
-                team_count += 1
-            else:
-                user_count += 1
-        
-        # Count repository characteristics
+        def counts_first_seen(column: pd.Series) -> pd.Series:
+            """Most common first; ties keep first-appearance order (a stable descending sort)."""
+            counts = column.value_counts(sort=False).reindex(column.unique())
+            return counts.sort_values(ascending=False, kind='mergesort')
+        
+        # Count by permission level and user type; value_counts() counts the categorical codes
+        # in one vectorized pass
+        permission_counts = counts_first_seen(permissions_data['permission'])
+        user_types = counts_first_seen(permissions_data['user_type'])
+        team_count = int(user_types.get('Team', 0))
+        user_count = total_permissions - team_count
+        
+        # Count repository characteristics from one boolean matrix (one row per repository),
+        # filled straight from a flat generator without an intermediate list of tuples
+        repo_flags = np.fromiter(
+            itertools.chain.from_iterable(
+                (repo['is_private'], repo['is_archived'], repo['is_fork'], repo['is_disabled'], bool(repo['collaborators']))
+                for repo in repos_data
+            ),
+            dtype=bool, count=5 * unique_repos
+        ).reshape(-1, 5)
+        private, archived, fork, disabled, repos_with_data = (int(n) for n in np.count_nonzero(repo_flags, axis=0))
         repo_characteristics = {
-            'private': 0, 'public': 0, 'archived': 0, 'active': 0, 
-            'fork': 0, 'original': 0, 'disabled': 0, 'enabled': 0
+            'private': private, 'public': unique_repos - private,
+            'archived': archived, 'active': unique_repos - archived,
+            'fork': fork, 'original': unique_repos - fork,
+            'disabled': disabled, 'enabled': unique_repos - disabled
         }
         
-        for repo in repos_data:
-            if repo['is_private']:
-                repo_characteristics['private'] += 1
-            else:
-                repo_characteristics['public'] += 1
-                
-            if repo['is_archived']:
-                repo_characteristics['archived'] += 1
-            else:
-                repo_characteristics['active'] += 1
-                
-            if repo['is_fork']:
-                repo_characteristics['fork'] += 1
-            else:
-                repo_characteristics['original'] += 1
-                
-            if repo['is_disabled']:
-                repo_characteristics['disabled'] += 1
-            else:
-                repo_characteristics['enabled'] += 1
-        
         elapsed_time = datetime.now() - self.start_time
         
-        print("\n" + "="*80)
-        print("🎉 GRAPHQL USER PERMISSIONS SUMMARY")
-        print("="*80)
-        print(f"⏱️  Total processing time: {elapsed_time}")
-        print(f"🔄 Total GraphQL queries: {self.total_queries:,}")
-        print(f"📊 Processing efficiency: {total_permissions/max(self.total_queries,1):.1f} records per query")
-        
-        print(f"\n📈 DATA SUMMARY (DIRECT ACCESS ONLY):")
-        print(f"   • Total access records: {total_permissions:,}")
-        print(f"   • Unique users: {user_count:,}")
-        print(f"   • Team entries: {team_count:,}")
-        print(f"   • Repositories processed: {unique_repos:,}")
-        print(f"   • Average access entries per repo: {total_permissions/max(unique_repos,1):.1f}")
-        
-        print(f"\n🔐 Permission Levels:")
-        for perm, count in sorted(permission_counts.items(), key=lambda x: x[1], reverse=True):
-            print(f"   • {perm}: {count:,}")
-        
-        print(f"\n👤 User Types:")
-        for user_type, count in sorted(user_types.items(), key=lambda x: x[1], reverse=True):
-            print(f"   • {user_type}: {count:,}")
-        
-        print(f"\n📦 Repository Characteristics:")
-        print(f"   • Private: {repo_characteristics['private']:,} | Public: {repo_characteristics['public']:,}")
-        print(f"   • Active: {repo_characteristics['active']:,} | Archived: {repo_characteristics['archived']:,}")
-        print(f"   • Original: {repo_characteristics['original']:,} | Forks: {repo_characteristics['fork']:,}")
-        print(f"   • Enabled: {repo_characteristics['enabled']:,} | Disabled: {repo_characteristics['disabled']:,}")
+        # Collect the report and emit it in one write instead of one locked write per line
+        lines = []
+        out = lines.append
+        
+        out("\n" + "="*80)
+        out("🎉 GRAPHQL USER PERMISSIONS SUMMARY")
+        out("="*80)
+        out(f"⏱️  Total processing time: {elapsed_time}")
+        out(f"🔄 Total GraphQL queries: {self.total_queries:,}")
+        out(f"📊 Processing efficiency: {total_permissions/max(self.total_queries,1):.1f} records per query")
+        
+        out(f"\n📈 DATA SUMMARY (DIRECT ACCESS ONLY):")
+        out(f"   • Total access records: {total_permissions:,}")
+        out(f"   • Unique users: {user_count:,}")
+        out(f"   • Team entries: {team_count:,}")
+        out(f"   • Repositories processed: {unique_repos:,}")
+        out(f"   • Average access entries per repo: {total_permissions/max(unique_repos,1):.1f}")
+        
+        out(f"\n🔐 Permission Levels:")
+        for perm, count in permission_counts.items():
+            out(f"   • {perm}: {count:,}")
+        
+        out(f"\n👤 User Types:")
+        for user_type, count in user_types.items():
+            out(f"   • {user_type}: {count:,}")
+        
+        out(f"\n📦 Repository Characteristics:")
+        out(f"   • Private: {repo_characteristics['private']:,} | Public: {repo_characteristics['public']:,}")
+        out(f"   • Active: {repo_characteristics['active']:,} | Archived: {repo_characteristics['archived']:,}")
+        out(f"   • Original: {repo_characteristics['original']:,} | Forks: {repo_characteristics['fork']:,}")
+        out(f"   • Enabled: {repo_characteristics['enabled']:,} | Disabled: {repo_characteristics['disabled']:,}")
         
         # Add data completeness assessment
-        repos_with_data = sum(1 for repo in repos_data if repo['collaborators'])
-        repos_without_data = len(repos_data) - repos_with_data
+        repos_without_data = unique_repos - repos_with_data
         completeness_percentage = (repos_with_data / max(len(repos_data), 1)) * 100
         
-        print(f"\n📈 Data Completeness Assessment:")
-        print(f"   • Repositories with collaborator data: {repos_with_data:,} ({completeness_percentage:.1f}%)")
-        print(f"   • Repositories without collaborator data: {repos_without_data:,} ({100-completeness_percentage:.1f}%)")
+        out(f"\n📈 Data Completeness Assessment:")
+        out(f"   • Repositories with collaborator data: {repos_with_data:,} ({completeness_percentage:.1f}%)")
+        out(f"   • Repositories without collaborator data: {repos_without_data:,} ({100-completeness_percentage:.1f}%)")
         
         if completeness_percentage < 90:
-            print(f"\n⚠️  Data completeness is {completeness_percentage:.1f}% - some repositories may be inaccessible")
-            print("💡 To improve completeness:")
-            print("   • Ensure your token has 'repo' scope for private repositories")
-            print("   • Check if you're a member of the organization")
-            print("   • Some repositories may genuinely have no collaborators")
+            out(f"\n⚠️  Data completeness is {completeness_percentage:.1f}% - some repositories may be inaccessible")
+            out("💡 To improve completeness:")
+            out("   • Ensure your token has 'repo' scope for private repositories")
+            out("   • Check if you're a member of the organization")
+            out("   • Some repositories may genuinely have no collaborators")
         else:
-            print(f"\n✅ Good data completeness: {completeness_percentage:.1f}%")
-        
-        # Add data completeness assessment
-        repos_with_data = sum(1 for repo in repos_data if repo['collaborators'])
-        repos_without_data = len(repos_data) - repos_with_data
-        completeness_percentage = (repos_with_data / max(len(repos_data), 1)) * 100
+            out(f"\n✅ Good data completeness: {completeness_percentage:.1f}%")
         
-        print(f"\n📈 Data Completeness Assessment:")
-        print(f"   • Repositories with collaborator data: {repos_with_data:,} ({completeness_percentage:.1f}%)")
-        print(f"   • Repositories without collaborator data: {repos_without_data:,} ({100-completeness_percentage:.1f}%)")
-        
-        if completeness_percentage < 90:
-            print(f"\n⚠️  Data completeness is {completeness_percentage:.1f}% - some repositories may be inaccessible")
-            print("💡 To improve completeness:")
-            print("   • Ensure your token has 'repo' scope for private repositories")
-            print("   • Check if you're a member of the organization")
-            print("   • Some repositories may genuinely have no collaborators")
-        else:
-            print(f"\n✅ Good data completeness: {completeness_percentage:.1f}%")
+        sys.stdout.write("\n".join(lines) + "\n")
+        sys.stdout.flush()
 
 
 def main():
@@ -1041,16 +1584,22 @@ def main():
     print("=" * 80)
     print("🎯 This script fetches DIRECT collaborators and teams only (no inherited permissions)")
     print("🔍 Uses GitHub's GraphQL API for efficient data retrieval")
-    print(f"📅 Started at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    started_at = datetime.now()
+    print(f"📅 Started at: {started_at.strftime('%Y-%m-%d %H:%M:%S')}")
     
     # Configuration
     organization = "relativityone"  # Change this to your organization
     include_archived = False  # Set to True to include archived repositories
+    include_forks = True  # Set to False to exclude forked repositories
+    write_parquet = False  # Set to True to also write the detailed permissions as Parquet (requires pyarrow)
     
     # Output files
     permissions_output = f"{organization}_direct_permissions_graphql.csv"
     summary_output = f"{organization}_direct_summary_graphql.csv"
     repo_summary_output = f"{organization}_repository_summary_graphql.csv"
+    parquet_output = f"{organization}_direct_permissions_graphql.parquet"
+    # Rows streamed during the fetch; not a .csv so a failed run leaves no report behind
+    partial_output = f"{permissions_output}.partial"
     
     # Check for GitHub token (prefer REL_TOKEN > GITHUB_PAT > GITHUB_TOKEN)
     github_token = os.getenv('REL_TOKEN') or os.getenv('GITHUB_PAT') or os.getenv('GITHUB_TOKEN')
@@ -1073,23 +1622,12 @@ def main():
         print(f"✅ GitHub token found and loaded: {token_type}")
         print(f"🔐 Token length: {len(github_token)} characters")
     
-    # Check for GitHub CLI (for enhanced team detection)
-    try:
-        result = subprocess.run(['gh', '--version'], capture_output=True, text=True)
-        if result.returncode == 0:
-            print("✅ GitHub CLI found - enhanced team permission detection enabled")
-        else:
-            print("⚠️  GitHub CLI not authenticated - team detection will be limited")
-            print("💡 Run 'gh auth login' for better team permission data")
-    except FileNotFoundError:
-        print("⚠️  GitHub CLI not installed - team detection will be limited")
-        print("💡 Install with: brew install gh && gh auth login")
-    
     print(f"🏢 Target organization: {organization}")
     print(f"📦 Include archived repositories: {include_archived}")
+    print(f"🍴 Include forked repositories: {include_forks}")
     
     # Initialize fetcher
-    fetcher = GitHubGraphQLPermissionsFetcher(github_token, organization)
+    fetcher = GitHubGraphQLPermissionsFetcher(github_token, organization, start_time=started_at)
     
     # Test API connection first
     if not fetcher.test_api_connection():
@@ -1107,27 +1645,53 @@ def main():
     print(f"🚀 GraphQL queries needed: ~50-200 queries vs 3000+ REST API calls")
     
     try:
-        # Fetch repositories with collaborators
+        # Fetch repositories with collaborators, streaming each repository's permission rows
+        # to a side file as it arrives so an interrupted run still leaves partial (unsorted)
+        # results. The report itself is only written, sorted, once all data has been collected.
         print(f"\n🎬 Starting GraphQL data collection for '{organization}'...")
-        repos_data = fetcher.fetch_repositories_with_collaborators(include_archived)
+        with open(partial_output, 'w', newline='', encoding='utf-8') as stream_file:
+            stream_writer = csv.writer(stream_file)
+            stream_writer.writerow(PERMISSION_FIELDNAMES)
+            repos_data = fetcher.fetch_repositories_with_collaborators(
+                include_archived,
+                sink=lambda repo: stream_writer.writerows(fetcher.repository_permission_rows(repo)),
+                include_forks=include_forks
+            )
+        
+        # Requests skipped by the authorization circuit breaker leave the audit incomplete
+        if fetcher.access_denied:
+            print("❌ GitHub repeatedly refused the token; the collected data is incomplete")
+            print(f"💡 Partial (unsorted) results remain in {partial_output}")
+            sys.exit(1)
+        
+        # A failed team listing page would drop team grants without any other sign
+        if fetcher.team_index_incomplete:
+            print("❌ Organization team access could not be fully fetched; the report would be incomplete")
+            print("💡 This is usually a transient GitHub API error - please run the script again")
+            print(f"💡 Partial (unsorted) results remain in {partial_output}")
+            sys.exit(1)
         
         if not repos_data:
             print("❌ No repository data found!")
+            print(f"💡 Partial (unsorted) results remain in {partial_output}")
             sys.exit(1)
         
         # Convert to permission records
         permissions_data = fetcher.process_repositories_to_permissions(repos_data)
         
-        if not permissions_data:
+        if permissions_data.empty:
             print("❌ No permissions data found!")
+            print(f"💡 Partial (unsorted) results remain in {partial_output}")
             sys.exit(1)
         
         print(f"\n✅ Collected {len(permissions_data)} permission records")
         
         # Create output files
-        fetcher.create_user_permissions_csv(permissions_data, permissions_output)
-        fetcher.create_user_summary_csv(permissions_data, summary_output)
-        fetcher.create_repository_summary_csv(repos_data, repo_summary_output)
+        fetcher.create_output_csvs(permissions_data, repos_data,
+                                   permissions_output, summary_output, repo_summary_output)
+        parquet_written = write_parquet and fetcher.create_user_permissions_parquet(permissions_data, parquet_output)
+        # The sorted report supersedes the streamed rows
+        os.remove(partial_output)
         
         # Print final summary
         fetcher.print_summary(permissions_data, repos_data)
@@ -1139,17 +1703,27 @@ def main():
         print(f"   • {permissions_output} - Detailed direct access permissions (users + teams)")
         print(f"   • {summary_output} - User and team summary with permission counts")
         print(f"   • {repo_summary_output} - Repository summary with direct collaborator counts")
+        if parquet_written:
+            print(f"   • {parquet_output} - Detailed direct access permissions in Parquet format")
         print(f"\n🎯 Note: This report contains DIRECT access only (excludes inherited org permissions)")
         print(f"🚀 GraphQL API provided significant performance improvement over REST API!")
         
     except KeyboardInterrupt:
+        # Wake any worker still sleeping out a rate limit or backoff so the exit is not delayed
+        fetcher.stop()
         print(f"\n⏸️  Processing interrupted by user")
+        if os.path.exists(partial_output):
+            print(f"💡 Partial (unsorted) results remain in {partial_output}")
         sys.exit(0)
     except Exception as e:
         print(f"\n❌ Error during processing: {e}")
         import traceback
         traceback.print_exc()
+        if os.path.exists(partial_output):
+            print(f"💡 Partial (unsorted) results remain in {partial_output}")
         sys.exit(1)
+    finally:
+        fetcher.close()
 
 
 if __name__ == "__main__":